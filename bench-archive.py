@@ -0,0 +1,118 @@
+"""
+Benchmark the product list with unsellable products archived vs kept in Product
+
+Usage: python bench-archive.py [number_of_products]
+Runs in a temporary test database (created and destroyed by the script),
+with 90% of the products unsellable.
+"""
+import os
+import sys
+import time
+import django
+
+# Setup Django environment
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fastprint_proj.settings')
+django.setup()
+
+from django.db import connection
+
+from products import events, views
+from products.archive import archive_unsellable
+from products.models import Product, ArchivedProduct, Category, Status
+
+UNSELLABLE_SHARE = 0.9
+
+
+def fill(count, kategori, bisa, tidak):
+    # Plain DELETE, skips loading every row for the delete signals
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {ArchivedProduct._meta.db_table}')
+        cursor.execute(f'DELETE FROM {Product._meta.db_table}')
+
+    unsellable = int(count * UNSELLABLE_SHARE)
+    Product.objects.bulk_create([
+        Product(
+            nama_produk=f'Product {i}',
+            harga=1000 + i,
+            kategori=kategori,
+            status=tidak if i < unsellable else bisa
+        ) for i in range(count)
+    ], batch_size=5000)
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('VACUUM ANALYZE products_product')
+        else:
+            cursor.execute('ANALYZE')
+
+
+def index_size(table):
+    """Size of all indexes on ``table`` in bytes, None if unknown"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_indexes_size(%s)', [table])
+            return cursor.fetchone()[0]
+        if connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                    [table]
+                )
+                return cursor.fetchone()[0] or 0
+            except Exception:
+                # SQLite built without the dbstat table
+                return None
+    return None
+
+
+def best_of(func, repeat=5):
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def list_query():
+    return list(Product.objects.filter(
+        status__nama_status='bisa dijual'
+    ).values_list('id_produk', 'nama_produk', 'harga', 'kategori__nama_kategori', 'status__nama_status'))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        kategori = Category.objects.create(nama_kategori='ATK')
+        bisa = Status.objects.create(nama_status='bisa dijual')
+        tidak = Status.objects.create(nama_status='tidak bisa dijual')
+
+        print(f'{count} products, {UNSELLABLE_SHARE:.0%} unsellable ({connection.vendor})\n')
+        print(f"{'layout':<16} {'Product rows':>12} {'query':>10} {'list view':>10} {'index size':>12}")
+
+        for archived in (False, True):
+            # No change events for the bulk moves
+            with events.batch():
+                fill(count, kategori, bisa, tidak)
+                if archived:
+                    archive_unsellable()
+            analyze()
+
+            size = index_size(Product._meta.db_table)
+            print(
+                f"{'archived' if archived else 'single table':<16} {Product.objects.count():>12}"
+                f" {best_of(list_query):>8.1f}ms {best_of(views._render_product_list):>8.1f}ms"
+                f" {size / 1024 if size is not None else float('nan'):>10.0f}kB"
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for product grid rendering (cards rendered per second)
+
+Usage: python bench-grid-render.py [number_of_cards]
+Runs on generated products, no database needed.
+"""
+import os
+import sys
+import time
+import django
+
+# Setup Django environment
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fastprint_proj.settings')
+django.setup()
+
+from django.template import engines
+from django.template.loader import render_to_string
+
+from products.formatting import grid_context, grid_products
+
+# Per-card template logic before precomputed fields (humanize filters + status if)
+ORIGINAL_GRID = """{% load humanize %}
+{% for product in products %}
+  <div class="border border-gray-200 rounded-lg p-5 hover:shadow-md transition-shadow">
+    <span class="text-xs text-gray-400 uppercase">{{ product.kategori }}</span>
+    <h3 class="text-base font-medium mt-1 line-clamp-2">{{ product.nama_produk }}</h3>
+    <span class="text-lg font-semibold">Rp {{ product.harga|floatformat:0|intcomma }}</span>
+    <span class="text-xs px-2 py-1 rounded {% if product.status == 'bisa dijual' %}bg-green-50 text-green-700{% else %}bg-red-50 text-red-700{% endif %}">{{ product.status }}</span>
+    <a href="/edit/{{ product.id_produk }}/">Edit</a>
+    <button onclick="deleteProduct('{{ product.id_produk }}', '{{ product.nama_produk }}')">Delete</button>
+  </div>
+{% endfor %}"""
+
+
+def make_rows(count):
+    return [
+        (i, f'Product {i}', 1000 + i * 250, f'Category {i % 12}', 'bisa dijual')
+        for i in range(1, count + 1)
+    ]
+
+
+def bench(name, render, count, repeat=5):
+    render()  # warm up (template compile, caches)
+    best = min(_timed(render) for _ in range(repeat))
+    print(f'{name:<32} {best * 1000:8.1f} ms  {count / best:12,.0f} cards/s')
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rows = make_rows(count)
+    print(f'Rendering {count} cards (best of 5)\n')
+
+    original = engines['django'].from_string(ORIGINAL_GRID)
+    original_products = [{
+        'id_produk': r[0], 'nama_produk': r[1], 'harga': float(r[2]),
+        'kategori': r[3], 'status': r[4]
+    } for r in rows]
+    bench('django, filters per card', lambda: original.render({'products': original_products}), count)
+
+    bench('format pass only', lambda: grid_products(rows), count)
+
+    bench(
+        'django, precomputed',
+        lambda: render_to_string('products/_product_grid.html', grid_context(grid_products(rows)), using='django'),
+        count
+    )
+
+    if 'jinja2' in engines:
+        bench(
+            'jinja2, precomputed',
+            lambda: render_to_string('products/_product_grid.html', grid_context(grid_products(rows)), using='jinja2'),
+            count
+        )
+    else:
+        print('jinja2, precomputed              skipped (pip install jinja2)')
+
+
+if __name__ == '__main__':
+    main()
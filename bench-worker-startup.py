@@ -0,0 +1,112 @@
+"""
+Measure worker startup with and without the pre-fork warmup
+
+Usage: python bench-worker-startup.py
+Needs a reachable database for the first request (Linux only: uses fork
+and /proc for memory numbers).
+
+Reports:
+- import time of django.setup() (full settings vs fetch-data-api.py settings)
+- time to first response in a freshly forked worker
+- per-worker RSS and private memory (USS) after that first response
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SETTINGS = os.environ.get('DJANGO_SETTINGS_MODULE', 'fastprint_proj.settings')
+
+
+def import_time(code, settings, repeat=5):
+    """Total import time in ms (best of ``repeat``), from python -X importtime"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings)
+    totals = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        totals.append(sum(int(m.group(1)) for m in re.finditer(r'import time:\s+(\d+) \|', result.stderr)))
+    return min(totals) / 1000
+
+
+def memory_kb():
+    """RSS and USS (private pages) of this process"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if rest.strip().endswith('kB'):
+                values[key] = int(rest.split()[0])
+    return values['Rss'], values['Private_Clean'] + values['Private_Dirty']
+
+
+def worker(warm):
+    """Child process: load the app like a preloading master, fork one worker"""
+    sys.path.append(BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', SETTINGS)
+    from fastprint_proj.wsgi import application
+
+    if warm:
+        from fastprint_proj.warmup import warmup
+        warmup()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        environ = {}
+        setup_testing_defaults(environ)
+        start = time.perf_counter()
+        response = application(environ, lambda status, headers: None)
+        b''.join(response)
+        first_response = time.perf_counter() - start
+        rss, uss = memory_kb()
+        os.write(write_fd, json.dumps({
+            'first_response_ms': first_response * 1000,
+            'rss_kb': rss,
+            'uss_kb': uss
+        }).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        print(pipe.read())
+    os.waitpid(pid, 0)
+
+
+def run_worker(warm):
+    result = subprocess.run(
+        [sys.executable, __file__, '--worker', 'warm' if warm else 'cold'],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    setup = 'import django; django.setup()'
+    print('Import time (python -X importtime)')
+    print(f"  django.setup(), full settings    {import_time(setup, SETTINGS):8.1f} ms")
+    print(f"  django.setup(), ingest settings  {import_time(setup, 'fastprint_proj.settings_ingest'):8.1f} ms")
+    print(f"  import fastprint_proj.wsgi       {import_time('import fastprint_proj.wsgi', SETTINGS):8.1f} ms")
+
+    print('\nForked worker, first request to /')
+    for warm in (False, True):
+        result = run_worker(warm)
+        label = 'with warmup' if warm else 'no warmup'
+        print(
+            f"  {label:<12} first response {result['first_response_ms']:8.1f} ms"
+            f"   RSS {result['rss_kb'] / 1024:6.1f} MB   private {result['uss_kb'] / 1024:6.1f} MB"
+        )
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--worker':
+        worker(sys.argv[2] == 'warm')
+    else:
+        main()
@@ -10,8 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -58,17 +64,36 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are cached in every environment, including DEBUG
+            # (runserver still clears the cache when a template file changes)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# Optional Jinja2 backend for the hot product grid template
+# (products/jinja2/), only registered when jinja2 is installed
+if jinja2 is not None:
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [],
+        'APP_DIRS': True,
+    })
+
+# Template engine used to render the product grid: 'django' or 'jinja2'
+PRODUCT_GRID_ENGINE = 'django'
+
 WSGI_APPLICATION = 'fastprint_proj.wsgi.application'
 
 
@@ -86,6 +111,16 @@ DATABASES = {
     }
 }
 
+# SQLite fallback, e.g. to run the tests without a PostgreSQL server:
+#   FASTPRINT_DB=sqlite python manage.py test
+if os.environ.get('FASTPRINT_DB') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,15 @@
+"""
+Minimal settings for fetch-data-api.py
+
+The ingest only writes the product tables, so only the products app is
+loaded (no admin, DRF or templates), which makes django.setup() much faster.
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'products',
+]
+
+MIDDLEWARE = []
+
+TEMPLATES = []
@@ -0,0 +1,79 @@
+"""
+Warm up the application before worker processes are forked.
+
+Everything loaded here (templates, URL resolver, serializer fields, the
+catalog query and render paths) is built once in the master process and shared with the
+workers through copy-on-write, so a fresh worker's first request is as fast
+as any other. ``gc.freeze()`` moves the warmed objects out of the garbage
+collector's reach: otherwise the first collection in each worker writes to
+every object header and copies the shared pages.
+
+Used by ``gunicorn.conf.py`` (``preload_app = True``), or call ``warmup()``
+yourself from any pre-fork server hook.
+"""
+import gc
+
+from django.db import DatabaseError, connections
+from django.template import engines
+from django.urls import get_resolver, reverse
+
+HOT_TEMPLATES = [
+    'products/product_list.html',
+    'products/product_form.html',
+    'products/product_edit.html',
+    'products/_product_grid.html',
+]
+
+
+def warmup(freeze=True):
+    """Preload everything a first request would build lazily"""
+    _load_templates()
+    _load_urls()
+    _load_serializers()
+    _load_catalog()
+
+    # Forked workers must not share the master's DB sockets
+    connections.close_all()
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+
+def _load_templates():
+    # Compiled templates stay in the cached loaders
+    for engine in engines.all():
+        for name in HOT_TEMPLATES:
+            try:
+                engine.get_template(name)
+            except Exception:
+                # Not every engine has every template (e.g. Jinja2 only has the grid)
+                pass
+
+
+def _load_urls():
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+    reverse('product_list')
+
+
+def _load_serializers():
+    from products.serializers import CategorySerializer, ProductSerializer, StatusSerializer
+
+    # Builds DRF field maps and model field info
+    for serializer_class in (ProductSerializer, CategorySerializer, StatusSerializer):
+        serializer_class().fields
+
+
+def _load_catalog():
+    from products import views
+
+    # Runs the queries and renders without storing the results: a value cached
+    # here would be copied into every worker and age there
+    try:
+        views._category_names()
+        views._render_product_list()
+    except DatabaseError:
+        # Database not reachable yet, workers will load these on demand
+        pass
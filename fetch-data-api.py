@@ -12,10 +12,13 @@ import django
 
 # Setup Django environment
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fastprint_proj.settings')
+# Only the products app is needed to write the three tables
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fastprint_proj.settings_ingest')
 django.setup()
 
-from products.models import Product, Category, Status
+from products import events
+from products.archive import archive_unsellable
+from products.models import Product, ArchivedProduct, Category, Status
 
 API_URL = "https://recruitment.fastprint.co.id/tes/api_tes_programmer"
 
@@ -64,7 +67,9 @@ def test_api():
                 products = data.get('data', [])
                 if products:
                     print(f"\n✅ Successfully fetched {len(products)} products!")
-                    save_to_database(products)
+                    # One 'reset' event for open product lists instead of one per row
+                    with events.batch():
+                        save_to_database(products)
                 else:
                     print("\n⚠️ No products in response")
         except Exception as e:
@@ -76,7 +81,7 @@ def save_to_database(products):
     
     try:
         # Check if there's existing data
-        product_count = Product.objects.count()
+        product_count = Product.objects.count() + ArchivedProduct.objects.count()
         category_count = Category.objects.count()
         status_count = Status.objects.count()
         
@@ -88,7 +93,9 @@ def save_to_database(products):
         # Delete all existing data
         if product_count > 0 or category_count > 0 or status_count > 0:
             print("\n🗑️ Deleting existing data...")
-            Product.objects.all().delete()
+            # Runs inside events.batch(), no need to load rows for delete events
+            events.delete_quietly(Product.objects.all())
+            ArchivedProduct.objects.all().delete()
             print("  ✓ Deleted all products")
             Category.objects.all().delete()
             print("  ✓ Deleted all categories")
@@ -138,8 +145,12 @@ def save_to_database(products):
                 print(f"  ⚠️ Error saving product {product.get('nama_produk')}: {e}")
         
         print(f"\n✅ Successfully saved {saved_count} products to database!")
+
+        # Keep only sellable products in the Product table
+        archived_count = archive_unsellable()
+        print(f"  ✓ Archived {archived_count} unsellable products")
         print(f"\n📊 New database totals:")
-        print(f"  - Products: {Product.objects.count()}")
+        print(f"  - Products: {Product.objects.count()} (+ {ArchivedProduct.objects.count()} archived)")
         print(f"  - Categories: {Category.objects.count()}")
         print(f"  - Statuses: {Status.objects.count()}")
         
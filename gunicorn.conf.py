@@ -0,0 +1,33 @@
+"""
+Gunicorn settings
+
+    pip install gunicorn uvicorn-worker
+    gunicorn
+
+Workers run the ASGI app: the product change feed keeps a request open per
+browser, which would pin a whole sync worker. Plain WSGI still works
+(``gunicorn fastprint_proj.wsgi -k sync``), the feed then falls back to
+short polling.
+"""
+import multiprocessing
+
+bind = '127.0.0.1:8000'
+wsgi_app = 'fastprint_proj.asgi:application'
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = multiprocessing.cpu_count() * 2 + 1
+
+# Import Django once in the master so workers share its memory
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded, before workers are forked
+    from fastprint_proj.warmup import warmup
+    warmup()
+
+
+def post_fork(server, worker):
+    # Listen for changes from the start, not from the first SSE request,
+    # so the worker's feed buffer has no gap
+    from products import events
+    events.start_listener()
@@ -0,0 +1,73 @@
+"""
+Archive for unsellable products.
+
+Only sellable products live in ``Product``, so list queries and their
+indexes only cover the products that are actually shown. Products with any
+other status are moved to ``ArchivedProduct`` (same columns, same id) and
+moved back when they become sellable again.
+"""
+from django.db import connection, transaction
+
+from . import events
+from .models import Product, ArchivedProduct
+
+SELLABLE_STATUS = 'bisa dijual'
+
+
+def _copy(instance, model):
+    return model(
+        id_produk=instance.id_produk,
+        nama_produk=instance.nama_produk,
+        harga=instance.harga,
+        kategori=instance.kategori,
+        status=instance.status
+    )
+
+
+def get_product(product_id):
+    """Product by id from either table, None if there is none"""
+    return (
+        Product.objects.select_related('kategori', 'status').filter(id_produk=product_id).first()
+        or ArchivedProduct.objects.select_related('kategori', 'status').filter(id_produk=product_id).first()
+    )
+
+
+@transaction.atomic
+def sync_archive(instance):
+    """Move a saved product to the table matching its status, return it"""
+    sellable = instance.status.nama_status == SELLABLE_STATUS
+
+    if isinstance(instance, Product) and not sellable:
+        archived = _copy(instance, ArchivedProduct)
+        archived.save()
+        instance.delete()
+        return archived
+
+    if isinstance(instance, ArchivedProduct) and sellable:
+        product = _copy(instance, Product)
+        instance.delete()
+        product.save()
+        return product
+
+    return instance
+
+
+@transaction.atomic
+def archive_unsellable():
+    """Move every unsellable product to the archive (bulk, e.g. after the ingest)"""
+    rows = list(
+        Product.objects.select_related('kategori', 'status')
+        .select_for_update(of=('self',))
+        .exclude(status__nama_status=SELLABLE_STATUS)
+    )
+    # Delete exactly the rows that were copied: running the filter again
+    # could match a row committed since and drop it without a copy
+    ids = [p.id_produk for p in rows]
+    batch_size = connection.ops.bulk_batch_size(['id_produk'], ids) or 1
+
+    # One 'reset' event instead of a delete event per row
+    with events.batch():
+        archived = ArchivedProduct.objects.bulk_create([_copy(p, ArchivedProduct) for p in rows])
+        for start in range(0, len(ids), batch_size):
+            events.delete_quietly(Product.objects.filter(id_produk__in=ids[start:start + batch_size]))
+    return len(archived)
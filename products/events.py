@@ -0,0 +1,265 @@
+"""
+Product change feed.
+
+Every product change bumps ``CatalogVersion`` in the same transaction and
+the new version is the event id, so ids are global across processes and
+follow commit order. The page and the ``Last-Event-ID`` header carry that
+id as the client's cursor.
+
+Events are kept in a small in-process ring buffer and pushed to browsers
+through the SSE endpoint in ``views.py``. Memory stays bounded no matter how
+many clients are connected: every client only remembers the id of the last
+event it has seen, and all clients waiting on the same event loop share a
+single wake-up ``asyncio.Event``, dropped once its last waiter is done.
+
+On PostgreSQL, events are sent with ``NOTIFY`` and every process (including
+the one that made the change) feeds its buffer from a ``LISTEN`` thread, so
+all buffers receive the same events in the same order. A client whose next
+event is not in the buffer (dropped from it, or missed before the listener
+started) gets a single 'reset' event.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+from .formatting import format_rupiah, status_class
+from .models import CatalogVersion
+
+# Number of recent events kept in memory. Clients that fall further behind
+# than this receive a single 'reset' event and reload the list.
+BUFFER_SIZE = 1000
+
+# Seconds a client waits for new events before the stream is closed and the
+# browser reconnects (EventSource does this on its own).
+POLL_TIMEOUT = 25
+
+# Seconds to wait for an already committed event to reach this process
+# before the client is told to reset.
+CATCH_UP_TIMEOUT = 2
+
+PG_CHANNEL = 'products_changes'
+
+
+class _Wakeup:
+    """Wake-up event shared by the clients waiting on one event loop"""
+
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.waiters = 0
+
+
+class ChangeFeed:
+    """Thread-safe ring buffer of product events with async waiting"""
+
+    def __init__(self, maxlen=BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._maxlen = maxlen
+        self._events = deque()  # ordered by id
+        self._wakeups = {}  # event loop -> _Wakeup
+
+    def publish(self, event_id, event_type, data):
+        """Append an event and wake up every waiting client"""
+        with self._lock:
+            # Events arrive in commit order, which is nearly id order: find
+            # the slot from the right, usually the very end
+            events = self._events
+            index = len(events)
+            while index and events[index - 1][0] > event_id:
+                index -= 1
+            events.insert(index, (event_id, event_type, data))
+            if len(events) > self._maxlen:
+                events.popleft()
+            wakeups = list(self._wakeups.items())
+            self._wakeups.clear()
+
+        for loop, wakeup in wakeups:
+            try:
+                loop.call_soon_threadsafe(wakeup.event.set)
+            except RuntimeError:
+                # Loop has been closed since the client started waiting
+                pass
+
+    def since(self, last_id):
+        """
+        Return the events following ``last_id`` without gaps.
+
+        If the next event is older than everything in the buffer, it was
+        dropped (or never received) and a single 'reset' event is returned.
+        A gap inside the buffer means an event is still on its way, so only
+        the events before the gap are returned.
+        """
+        with self._lock:
+            return self._since(last_id)
+
+    def _since(self, last_id):
+        # Only touches the events newer than last_id, clients are usually
+        # close to the end of the buffer
+        events = self._events
+        if not events or events[-1][0] <= last_id:
+            return []
+        if last_id + 1 < events[0][0]:
+            return [(events[-1][0], 'reset', {})]
+
+        newer = []
+        for event in reversed(events):
+            if event[0] <= last_id:
+                break
+            newer.append(event)
+        newer.reverse()
+
+        pending = []
+        for event in newer:
+            if event[0] != last_id + 1 + len(pending):
+                break
+            pending.append(event)
+        return pending
+
+    async def wait(self, last_id, timeout=POLL_TIMEOUT):
+        """Return ``since(last_id)`` as soon as it is not empty, or [] on timeout"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            with self._lock:
+                pending = self._since(last_id)
+                if pending or remaining <= 0:
+                    # Nothing registered, e.g. WSGI requests that run every
+                    # poll on a fresh event loop never leave an entry behind
+                    return pending
+                wakeup = self._wakeups.get(loop)
+                if wakeup is None:
+                    wakeup = self._wakeups[loop] = _Wakeup()
+                wakeup.waiters += 1
+
+            try:
+                await asyncio.wait_for(wakeup.event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
+            finally:
+                with self._lock:
+                    wakeup.waiters -= 1
+                    if not wakeup.waiters and self._wakeups.get(loop) is wakeup:
+                        del self._wakeups[loop]
+
+
+feed = ChangeFeed()
+
+_state = threading.local()
+
+
+def suppressed():
+    """True inside batch(): per-product events are skipped"""
+    return getattr(_state, 'suppressed', False)
+
+
+@contextmanager
+def batch():
+    """
+    Suppress per-product events inside the block and publish a single
+    'reset' event at the end. Used by bulk writes such as the API ingest.
+    """
+    previous = suppressed()
+    _state.suppressed = True
+    try:
+        yield
+    finally:
+        _state.suppressed = previous
+    if not previous:
+        send('reset', {})
+
+
+def delete_quietly(queryset):
+    """
+    Delete rows with a single DELETE, without loading them for the
+    post_delete receivers. Only for bulk writes inside batch().
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def product_payload(product):
+    """Card data for a product, same shape as the list view uses"""
+    return {
+        'id_produk': product.id_produk,
+        'nama_produk': product.nama_produk,
+        'harga': float(product.harga),
+        'harga_display': format_rupiah(product.harga),
+        'kategori': product.kategori.nama_kategori,
+        'status': product.status.nama_status,
+        'status_class': status_class(product.status.nama_status),
+    }
+
+
+def send(event_type, data):
+    """
+    Bump the catalog version and publish the event once the current
+    transaction commits. Returns the event id. Callers check suppressed()
+    first, before building ``data``.
+    """
+    event_id = CatalogVersion.bump()
+
+    if connection.vendor == 'postgresql':
+        # Delivered on commit to every process, this one included
+        message = json.dumps({'id': event_id, 'type': event_type, 'data': data})
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [PG_CHANNEL, message])
+    else:
+        transaction.on_commit(lambda: feed.publish(event_id, event_type, data))
+
+    return event_id
+
+
+# ============================================
+# PostgreSQL LISTEN (events from other processes)
+# ============================================
+
+_listener_lock = threading.Lock()
+_listener_started = False
+
+
+def start_listener():
+    """Start the LISTEN thread once per process (PostgreSQL only)"""
+    global _listener_started
+    if connection.vendor != 'postgresql':
+        return
+    with _listener_lock:
+        if _listener_started:
+            return
+        _listener_started = True
+    threading.Thread(target=_listen, name='product-events-listener', daemon=True).start()
+
+
+def _listen():
+    import select
+    import time
+    from django.db import connections
+
+    while True:
+        # Each thread gets its own connection from Django
+        conn = connections['default']
+        try:
+            conn.ensure_connection()
+            raw = conn.connection
+            with raw.cursor() as cursor:
+                cursor.execute(f'LISTEN {PG_CHANNEL}')
+
+            while True:
+                if select.select([raw], [], [], POLL_TIMEOUT) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    _handle_notify(raw.notifies.pop(0).payload)
+        except Exception:
+            conn.close()
+            time.sleep(5)
+
+
+def _handle_notify(payload):
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        return
+    feed.publish(message['id'], message.get('type', 'reset'), message.get('data', {}))
@@ -0,0 +1,51 @@
+"""
+Display formatting for product cards.
+
+Values are formatted once per list in plain Python so the templates only
+print strings, which keeps the per-card template work small.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+
+def format_rupiah(value):
+    """Format a price with Indonesian grouping, e.g. 1250000 -> '1.250.000'"""
+    amount = Decimal(value).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    # + 0 turns -0 (e.g. from -0.4) into 0
+    amount += 0
+    return f'{amount:,}'.replace(',', '.')
+
+
+def status_class(status):
+    """Badge colour classes for a product status"""
+    if status == 'bisa dijual':
+        return 'bg-green-50 text-green-700'
+    return 'bg-red-50 text-red-700'
+
+
+# Card with empty fields, cloned in the browser for new products
+BLANK_CARD = dict.fromkeys(
+    ['id_produk', 'nama_produk', 'harga', 'harga_display', 'kategori', 'status', 'status_class'], ''
+)
+
+
+def grid_products(rows):
+    """
+    Build card dicts for the product grid in a single pass.
+
+    ``rows`` are ``(id_produk, nama_produk, harga, kategori, status)`` tuples,
+    as returned by ``values_list`` in the list view.
+    """
+    return [{
+        'id_produk': id_produk,
+        'nama_produk': nama_produk,
+        'harga': float(harga),
+        'harga_display': format_rupiah(harga),
+        'kategori': kategori,
+        'status': status,
+        'status_class': status_class(status)
+    } for id_produk, nama_produk, harga, kategori, status in rows]
+
+
+def grid_context(products):
+    """Context for products/_product_grid.html (both engines)"""
+    return {'products': products, 'cards': products + [BLANK_CARD]}
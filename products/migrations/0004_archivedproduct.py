@@ -0,0 +1,60 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def archive_unsellable(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ArchivedProduct = apps.get_model('products', 'ArchivedProduct')
+
+    rows = Product.objects.exclude(status__nama_status='bisa dijual')
+    ArchivedProduct.objects.bulk_create([
+        ArchivedProduct(
+            id_produk=p.id_produk,
+            nama_produk=p.nama_produk,
+            harga=p.harga,
+            kategori_id=p.kategori_id,
+            status_id=p.status_id,
+        ) for p in rows
+    ])
+    rows.delete()
+
+
+def restore_archived(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ArchivedProduct = apps.get_model('products', 'ArchivedProduct')
+
+    Product.objects.bulk_create([
+        Product(
+            id_produk=p.id_produk,
+            nama_produk=p.nama_produk,
+            harga=p.harga,
+            kategori_id=p.kategori_id,
+            status_id=p.status_id,
+        ) for p in ArchivedProduct.objects.all()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_rename_kategori_id_product_kategori_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProduct',
+            fields=[
+                ('nama_produk', models.CharField(max_length=255)),
+                ('harga', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('id_produk', models.IntegerField(primary_key=True, serialize=False)),
+                ('kategori', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.category')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.status')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(archive_unsellable, restore_archived),
+    ]
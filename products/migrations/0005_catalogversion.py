@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-19 16:56
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    CatalogVersion = apps.get_model('products', 'CatalogVersion')
+    CatalogVersion.objects.create(pk=1, version=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_archivedproduct'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 # Create your models here.
 class Category(models.Model):
@@ -14,12 +14,43 @@ class Status(models.Model):
 
     def __str__(self):
         return self.nama_status
-class Product(models.Model):
-    id_produk = models.AutoField(primary_key=True)
+class BaseProduct(models.Model):
     nama_produk = models.CharField(max_length=255)
     harga = models.DecimalField(max_digits=10, decimal_places=2)
     kategori = models.ForeignKey(Category, on_delete=models.CASCADE)
     status = models.ForeignKey(Status, on_delete=models.CASCADE)
 
+    class Meta:
+        abstract = True
+
     def __str__(self):
-        return self.nama_produk
\ No newline at end of file
+        return self.nama_produk
+
+class Product(BaseProduct):
+    """Sellable products, the table every list page reads"""
+    id_produk = models.AutoField(primary_key=True)
+
+class ArchivedProduct(BaseProduct):
+    """Unsellable products, moved out of Product (see archive.py)"""
+    # Keeps the id from Product so the product can be moved back
+    id_produk = models.IntegerField(primary_key=True)
+
+class CatalogVersion(models.Model):
+    """
+    Single-row counter bumped in the same transaction as every product change.
+    Its value is the global id of each change event, shared by all processes.
+    """
+    version = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        """Increment the version and return the new value"""
+        with transaction.atomic():
+            # The row stays locked until commit, so versions follow commit order
+            if not cls.objects.filter(pk=1).update(version=models.F('version') + 1):
+                cls.objects.create(pk=1, version=1)
+            return cls.objects.filter(pk=1).values_list('version', flat=True).get()
@@ -1,4 +1,6 @@
+from django.db import transaction
 from rest_framework import serializers
+from .archive import sync_archive
 from .models import Product, Category, Status
 
 
@@ -39,6 +41,7 @@ class ProductSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Price must be a positive number")
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create new product with category and status lookup"""
         kategori_nama = validated_data.pop('kategori')
@@ -57,10 +60,13 @@ class ProductSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        return product
+        # Unsellable products go straight to the archive, in the same
+        # transaction as the insert
+        return sync_archive(product)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        """Update existing product"""
+        """Update existing product (from Product or ArchivedProduct)"""
         # Handle category update
         if 'kategori' in validated_data:
             kategori_nama = validated_data.pop('kategori')
@@ -78,4 +84,6 @@ class ProductSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         
         instance.save()
-        return instance
+
+        # Move between Product and the archive when the status changed
+        return sync_archive(instance)
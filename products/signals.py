@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import events
+from .models import Product
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    """Push created/updated product to the change feed"""
+    if events.suppressed():
+        return
+    events.send('upsert', events.product_payload(instance))
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    """Push deleted product id to the change feed"""
+    if events.suppressed():
+        return
+    events.send('delete', {'id_produk': instance.id_produk})
@@ -0,0 +1,142 @@
+"""
+Request coalescing (single-flight) for expensive catalog reads.
+
+Results are stored in the Django cache, tagged with the version they were
+built from. The version is read from the database on every call
+(``CatalogVersion``, bumped in the same transaction as every product
+change), so every process sees changes made by any other process, e.g. the
+API ingest, without relying on the cache being shared.
+
+- Fresh value in the cache: returned directly.
+- Stale value: returned directly while one thread rebuilds it in the
+  background, so readers never wait on a rebuild.
+- No value yet: concurrent callers in this process wait on one computation.
+
+On PostgreSQL an advisory lock also elects a single rebuilder across
+processes. This only saves work across processes when they share the cache
+backend (the default local-memory cache is per process).
+"""
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import connection
+
+from .models import CatalogVersion
+
+
+class _Flight:
+    """One in-flight computation that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, namespace, version):
+        self.namespace = namespace
+        self.version = version  # callable returning the current data version
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def get(self, key, compute):
+        """Return the cached value for ``key``, computing it at most once"""
+        generation = self.version()
+        entry = cache.get(self._cache_key(key))
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if entry is not None:
+            # Serve stale, rebuild in the background
+            if leader:
+                threading.Thread(
+                    target=self._refresh,
+                    args=(key, compute, flight, True),
+                    daemon=True
+                ).start()
+            return entry[1]
+
+        if leader:
+            self._refresh(key, compute, flight, False)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def wait(self, key, timeout=None):
+        """Wait for a running computation of ``key``, False on timeout"""
+        with self._lock:
+            flight = self._flights.get(key)
+        return flight is None or flight.done.wait(timeout)
+
+    def _cache_key(self, key):
+        return f'{self.namespace}:{key}'
+
+    def _refresh(self, key, compute, flight, background):
+        try:
+            with advisory_lock(self._cache_key(key), blocking=not background) as locked:
+                if not locked:
+                    # Another process is rebuilding, keep serving stale
+                    return
+
+                # Tag with the generation read *before* computing, so a change
+                # made during the computation leaves the result stale
+                generation = self.version()
+                entry = cache.get(self._cache_key(key))
+                if entry is not None and entry[0] == generation:
+                    # Rebuilt by another process while we waited for the lock
+                    flight.value = entry[1]
+                    return
+
+                flight.value = compute()
+                cache.set(self._cache_key(key), (generation, flight.value), timeout=None)
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+            if background:
+                # Background threads get their own DB connection
+                connection.close()
+
+
+@contextmanager
+def advisory_lock(name, blocking=True):
+    """
+    PostgreSQL session advisory lock, yields whether it was acquired.
+    On other databases there is nothing to lock across processes.
+    """
+    if connection.vendor != 'postgresql':
+        yield True
+        return
+
+    lock_id = int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big', signed=True)
+    with connection.cursor() as cursor:
+        if blocking:
+            cursor.execute('SELECT pg_advisory_lock(%s)', [lock_id])
+            locked = True
+        else:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [lock_id])
+            locked = cursor.fetchone()[0]
+    try:
+        yield locked
+    finally:
+        if locked:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [lock_id])
+
+
+# Product list and any other read built from the whole catalog
+catalog = SingleFlight('catalog', CatalogVersion.current)
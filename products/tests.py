@@ -1,3 +1,326 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+
+from . import events, views
+from .archive import archive_unsellable
+from .events import ChangeFeed
+from .formatting import format_rupiah, grid_context, grid_products
+from .models import Product, ArchivedProduct, CatalogVersion, Category, Status
+from .singleflight import catalog
+
+CONCURRENT_REQUESTS = 500
+
+
+class ProductListSingleFlightTest(SimpleTestCase):
+    """Concurrent product_list requests share one computation"""
+
+    def setUp(self):
+        cache.clear()
+        # Stand-in for CatalogVersion, so these tests need no database
+        self.version = 0
+        patcher = mock.patch.object(catalog, 'version', lambda: self.version)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+        self.release = threading.Event()
+        self.release.set()
+
+    def fake_render_product_list(self):
+        with self.calls_lock:
+            self.calls += 1
+        time.sleep(0.2)  # slow enough for all requests to pile up
+        self.release.wait(5)
+        return {'product_grid': f'grid-{self.calls}', 'total_count': 0, 'last_event_id': 0}
+
+    def fire_requests(self):
+        """Send concurrent requests, return the response bodies"""
+        factory = RequestFactory()
+        barrier = threading.Barrier(CONCURRENT_REQUESTS)
+        responses = [None] * CONCURRENT_REQUESTS
+
+        def request(i):
+            barrier.wait()
+            responses[i] = views.product_list(factory.get('/'))
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(CONCURRENT_REQUESTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        return [r.content.decode() for r in responses]
+
+    def test_cold_cache_computes_once(self):
+        with mock.patch.object(views, '_render_product_list', self.fake_render_product_list):
+            bodies = self.fire_requests()
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all('grid-1' in body for body in bodies))
+
+    def test_invalidation_computes_once_and_serves_stale(self):
+        with mock.patch.object(views, '_render_product_list', self.fake_render_product_list):
+            views.product_list(RequestFactory().get('/'))
+
+            # Hold the rebuild until every request has been answered
+            self.release.clear()
+            self.version += 1
+            started = time.perf_counter()
+            bodies = self.fire_requests()
+            elapsed = time.perf_counter() - started
+
+            # Nobody waited for the rebuild, everyone got the previous grid
+            self.assertTrue(all('grid-1' in body for body in bodies))
+            self.assertLess(elapsed, 5)
+
+            self.release.set()
+            self.assertTrue(catalog.wait('product_list', timeout=5))
+            response = views.product_list(RequestFactory().get('/'))
+
+        self.assertEqual(self.calls, 2)
+        self.assertIn('grid-2', response.content.decode())
+
+
+class ProductListTest(TestCase):
+    """Product grid rendering"""
+
+    def setUp(self):
+        cache.clear()
+        kategori = Category.objects.create(nama_kategori='ATK')
+        status = Status.objects.create(nama_status='bisa dijual')
+        Product.objects.create(nama_produk='Pensil', harga=1250000, kategori=kategori, status=status)
+
+    @override_settings(PRODUCT_GRID_ENGINE='missing')
+    def test_unknown_grid_engine_falls_back_to_django(self):
+        response = views.product_list(RequestFactory().get('/'))
+        content = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('1.250.000', content)
+        self.assertIn('<template id="product-card-template">', content)
+
+
+class ProductGridTest(SimpleTestCase):
+    """Card formatting and the two copies of the grid template"""
+
+    def test_format_rupiah_rounds_half_up(self):
+        self.assertEqual(format_rupiah(Decimal('1250000')), '1.250.000')
+        self.assertEqual(format_rupiah(Decimal('1500.5')), '1.501')
+        self.assertEqual(format_rupiah(Decimal('1500.49')), '1.500')
+        self.assertEqual(format_rupiah(Decimal('0.5')), '1')
+
+    def test_format_rupiah_zero_and_negative(self):
+        self.assertEqual(format_rupiah(0), '0')
+        self.assertEqual(format_rupiah(Decimal('-0.4')), '0')
+        self.assertEqual(format_rupiah(Decimal('-2500.5')), '-2.501')
+
+    @skipUnless('jinja2' in engines, 'jinja2 is not installed')
+    def test_engines_render_the_same_grid(self):
+        rows = [
+            (1, 'Pensil <2B> & "HB"', Decimal('1250000'), 'ATK', 'bisa dijual'),
+            (2, "Kertas 'A4'", Decimal('0.5'), 'Kertas', 'tidak bisa dijual'),
+        ]
+        for products in (grid_products(rows), []):
+            context = grid_context(products)
+            django_html = render_to_string('products/_product_grid.html', context, using='django')
+            jinja2_html = render_to_string('products/_product_grid.html', context, using='jinja2')
+
+            # Same escaping, spelled differently by MarkupSafe
+            jinja2_html = jinja2_html.replace('&#34;', '&quot;').replace('&#39;', '&#x27;')
+            self.assertEqual(jinja2_html.strip(), django_html.strip())
+
+
+class ProductArchiveTest(TestCase):
+    """Unsellable products live in ArchivedProduct, not Product"""
+
+    def setUp(self):
+        self.kategori = Category.objects.create(nama_kategori='ATK')
+        self.bisa = Status.objects.create(nama_status='bisa dijual')
+        self.tidak = Status.objects.create(nama_status='tidak bisa dijual')
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
+
+    def test_create_unsellable_goes_to_archive(self):
+        response = self.send('post', '/api/products/', {
+            'nama_produk': 'Pensil', 'harga': 1500, 'kategori': 'ATK', 'status': 'tidak bisa dijual'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Product.objects.exists())
+        self.assertEqual(ArchivedProduct.objects.get().nama_produk, 'Pensil')
+
+    def test_status_change_moves_product_and_keeps_id(self):
+        product = Product.objects.create(nama_produk='Pensil', harga=1500, kategori=self.kategori, status=self.bisa)
+        url = f'/api/products/{product.id_produk}/'
+
+        self.send('patch', url, {'status': 'tidak bisa dijual'})
+        self.assertFalse(Product.objects.exists())
+        self.assertTrue(ArchivedProduct.objects.filter(id_produk=product.id_produk).exists())
+
+        self.send('patch', url, {'status': 'bisa dijual', 'harga': 2000})
+        self.assertFalse(ArchivedProduct.objects.exists())
+        self.assertEqual(Product.objects.get(id_produk=product.id_produk).harga, 2000)
+
+    def test_failed_move_rolls_back_create(self):
+        with mock.patch('products.serializers.sync_archive', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            self.send('post', '/api/products/', {
+                'nama_produk': 'Pensil', 'harga': 1500, 'kategori': 'ATK', 'status': 'tidak bisa dijual'
+            })
+
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(ArchivedProduct.objects.exists())
+
+    def test_missing_product_is_404(self):
+        self.assertEqual(self.client.get('/edit/999/').status_code, 404)
+
+    def test_new_category_from_archived_product_shows_in_form(self):
+        product = ArchivedProduct.objects.create(
+            id_produk=1, nama_produk='Pensil', harga=1500, kategori=self.kategori, status=self.tidak
+        )
+        self.client.get('/add/')
+
+        self.send('patch', f'/api/products/{product.id_produk}/', {'kategori': 'NEWCAT'})
+
+        self.assertContains(self.client.get('/add/'), 'NEWCAT')
+
+    def test_archive_unsellable(self):
+        for i in range(10):
+            status = self.bisa if i == 0 else self.tidak
+            Product.objects.create(nama_produk=f'P{i}', harga=i, kategori=self.kategori, status=status)
+
+        self.assertEqual(archive_unsellable(), 9)
+        self.assertEqual(Product.objects.get().nama_produk, 'P0')
+        self.assertEqual(ArchivedProduct.objects.count(), 9)
+
+    def test_archive_unsellable_only_deletes_copied_rows(self):
+        Product.objects.create(nama_produk='P0', harga=1, kategori=self.kategori, status=self.tidak)
+        bulk_create = ArchivedProduct.objects.bulk_create
+
+        def bulk_create_then_insert(objs):
+            # Committed by another process between the copy and the delete
+            Product.objects.create(nama_produk='Late', harga=2, kategori=self.kategori, status=self.tidak)
+            return bulk_create(objs)
+
+        with mock.patch.object(ArchivedProduct.objects, 'bulk_create', bulk_create_then_insert):
+            self.assertEqual(archive_unsellable(), 1)
+
+        self.assertEqual(Product.objects.get().nama_produk, 'Late')
+        self.assertEqual(ArchivedProduct.objects.get().nama_produk, 'P0')
+
+
+class ChangeFeedTest(SimpleTestCase):
+    """Cursor handling of the in-process event buffer"""
+
+    def test_since_returns_events_without_gaps(self):
+        feed = ChangeFeed()
+        for event_id in (5, 6, 8):
+            feed.publish(event_id, 'upsert', {'id_produk': event_id})
+
+        self.assertEqual([e[0] for e in feed.since(4)], [5, 6])
+        self.assertEqual(feed.since(6), [])  # 7 still on its way
+        self.assertEqual(feed.since(8), [])
+
+    def test_events_published_out_of_order(self):
+        feed = ChangeFeed()
+        for event_id in (5, 7, 6):
+            feed.publish(event_id, 'upsert', {})
+
+        self.assertEqual([e[0] for e in feed.since(4)], [5, 6, 7])
+        self.assertEqual([e[0] for e in feed.since(5)], [6, 7])
+
+    def test_reset_when_next_event_was_never_received(self):
+        feed = ChangeFeed()
+        feed.publish(10, 'upsert', {})
+
+        self.assertEqual(feed.since(7), [(10, 'reset', {})])
+
+    def test_reset_after_buffer_overflow(self):
+        feed = ChangeFeed(maxlen=3)
+        for event_id in range(1, 6):
+            feed.publish(event_id, 'upsert', {})
+
+        self.assertEqual(feed.since(1), [(5, 'reset', {})])
+        self.assertEqual([e[0] for e in feed.since(2)], [3, 4, 5])
+
+    def test_wait_wakes_up_on_publish_from_another_thread(self):
+        feed = ChangeFeed()
+        threading.Timer(0.1, feed.publish, args=(1, 'delete', {'id_produk': 3})).start()
+
+        pending = asyncio.run(feed.wait(0, timeout=5))
+
+        self.assertEqual(pending, [(1, 'delete', {'id_produk': 3})])
+
+    def test_wait_times_out(self):
+        self.assertEqual(asyncio.run(ChangeFeed().wait(0, timeout=0.05)), [])
+
+    def test_repeated_polls_leave_no_wakeups_behind(self):
+        # Like WSGI requests: every poll runs on its own event loop
+        feed = ChangeFeed()
+        for i in range(200):
+            asyncio.run(feed.wait(0, timeout=0 if i % 2 else 0.001))
+
+        self.assertEqual(feed._wakeups, {})
+
+
+class ProductEventsTest(TestCase):
+    """Product writes emit change events with consecutive ids"""
+
+    def setUp(self):
+        self.kategori = Category.objects.create(nama_kategori='ATK')
+        self.bisa = Status.objects.create(nama_status='bisa dijual')
+
+    def create(self, name):
+        return Product.objects.create(nama_produk=name, harga=1500, kategori=self.kategori, status=self.bisa)
+
+    def test_create_update_delete(self):
+        start = CatalogVersion.current()
+        with mock.patch.object(events, 'send', wraps=events.send) as send:
+            product = self.create('Pensil')
+            product.harga = 2500
+            product.save()
+            product_id = product.id_produk
+            product.delete()
+
+        self.assertEqual([c.args[0] for c in send.call_args_list], ['upsert', 'upsert', 'delete'])
+        self.assertEqual(send.call_args_list[1].args[1]['harga_display'], '2.500')
+        self.assertEqual(send.call_args_list[2].args[1], {'id_produk': product_id})
+        self.assertEqual(CatalogVersion.current(), start + 3)
+
+    def test_feed_does_not_long_poll_under_wsgi(self):
+        started = time.perf_counter()
+        response = self.client.get('/api/products/events/')
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        content = asyncio.run(read()).decode()
+
+        self.assertLess(time.perf_counter() - started, events.POLL_TIMEOUT)
+        self.assertTrue(content.startswith('retry: 5000'))
+        self.assertIn(': heartbeat', content)
+
+    def test_batch_sends_single_reset(self):
+        start = CatalogVersion.current()
+        with mock.patch.object(events, 'send', wraps=events.send) as send, \
+                mock.patch.object(events, 'product_payload') as payload:
+            with events.batch():
+                for i in range(5):
+                    self.create(f'P{i}')
+                events.delete_quietly(Product.objects.all())
+
+        payload.assert_not_called()
+        send.assert_called_once_with('reset', {})
+        self.assertFalse(Product.objects.exists())
+        self.assertEqual(CatalogVersion.current(), start + 1)
@@ -9,6 +9,7 @@ urlpatterns = [
     
     # API endpoints (RESTful)
     path('api/products/', views.create_product_api, name='api_create_product'),
+    path('api/products/events/', views.product_events_api, name='api_product_events'),
     path('api/products/<str:product_id>/', views.update_product_api, name='api_update_product'),
     path('api/products/<str:product_id>/delete/', views.delete_product_api, name='api_delete_product'),
 ]
\ No newline at end of file
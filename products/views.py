@@ -1,53 +1,88 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.template import engines
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from django.views.decorators.csrf import csrf_exempt
 import json
-from .models import Product, Category
+from . import events
+from .archive import get_product
+from .formatting import grid_context, grid_products
+from .models import Product, Category, CatalogVersion
 from .serializers import ProductSerializer
+from .singleflight import catalog
 
 # Create your views here.
 def product_list(request): 
     """Display list of products with 'bisa dijual' status"""
-    products_qs = Product.objects.select_related('kategori', 'status').filter(
+    # Concurrent requests share one query + render, stale pages are served
+    # while the grid is rebuilt after a change
+    context = catalog.get('product_list', _render_product_list)
+
+    return render(request, 'products/product_list.html', context)
+
+def _render_product_list():
+    """Query and render the product grid (cached by product_list)"""
+    # Read before the query: events published meanwhile are replayed to the
+    # client, and upserts are idempotent
+    last_event_id = CatalogVersion.current()
+
+    rows = Product.objects.filter(
         status__nama_status='bisa dijual'
-    )
-    
-    # Convert to dict format for template compatibility
-    products = [{
-        'id_produk': p.id_produk,
-        'nama_produk': p.nama_produk,
-        'harga': float(p.harga),
-        'kategori': p.kategori.nama_kategori,
-        'status': p.status.nama_status
-    } for p in products_qs]
+    ).values_list('id_produk', 'nama_produk', 'harga', 'kategori__nama_kategori', 'status__nama_status')
 
-    context = {
-        'products': products,
-        'total_count': len(products)
+    # Prices and badge classes are formatted here in one pass, so the grid
+    # template only prints precomputed strings
+    products = grid_products(rows)
+
+    # Jinja2 grid is opt-in (PRODUCT_GRID_ENGINE), both engines escape output
+    product_grid = mark_safe(render_to_string(
+        'products/_product_grid.html',
+        grid_context(products),
+        using=_grid_engine()
+    ))
+
+    return {
+        'product_grid': product_grid,
+        'total_count': len(products),
+        'last_event_id': last_event_id
     }
 
-    return render(request, 'products/product_list.html', context)
+def _grid_engine():
+    """PRODUCT_GRID_ENGINE, or 'django' if that engine is not configured (jinja2 not installed)"""
+    if settings.PRODUCT_GRID_ENGINE in engines:
+        return settings.PRODUCT_GRID_ENGINE
+    return 'django'
+
+def _category_names():
+    """Category names for the form dropdowns"""
+    return list(Category.objects.values_list('nama_kategori', flat=True).order_by('nama_kategori'))
 
 def product_form(request):
     """Display form to add new product"""
     # Only show form (API endpoint handles creation)
-    categories = Category.objects.values_list('nama_kategori', flat=True).order_by('nama_kategori')
-    
     context = {
-        'categories': list(categories),
+        'categories': _category_names(),
         'status_choices': ['bisa dijual', 'tidak bisa dijual']
     }
     
     return render(request, 'products/product_form.html', context)
 
+def _get_product_or_404(product_id):
+    """Product (sellable or archived) by id, 404 if there is none"""
+    product = get_product(product_id)
+    if product is None:
+        raise Http404('No Product matches the given query.')
+    return product
+
 def product_edit(request, product_id):
     """Display form to edit existing product"""
     # Only show form (API endpoint handles update)
-    product_obj = get_object_or_404(
-        Product.objects.select_related('kategori', 'status'),
-        id_produk=product_id
-    )
+    product_obj = _get_product_or_404(product_id)
     
     product = {
         'id_produk': product_obj.id_produk,
@@ -57,11 +92,9 @@ def product_edit(request, product_id):
         'status': product_obj.status.nama_status
     }
     
-    categories = Category.objects.values_list('nama_kategori', flat=True).order_by('nama_kategori')
-    
     context = {
         'product': product,
-        'categories': list(categories),
+        'categories': _category_names(),
         'status_choices': ['bisa dijual', 'tidak bisa dijual']
     }
     
@@ -100,7 +133,7 @@ def update_product_api(request, product_id):
     """API endpoint to update existing product (PUT/PATCH)"""
     if request.method in ['PUT', 'PATCH']:
         try:
-            product_obj = get_object_or_404(Product, id_produk=product_id)
+            product_obj = _get_product_or_404(product_id)
             data = json.loads(request.body)
             
             # partial=True for PATCH, False for PUT
@@ -128,7 +161,7 @@ def delete_product_api(request, product_id):
     """API endpoint to delete product (DELETE)"""
     if request.method == 'DELETE':
         try:
-            product_obj = get_object_or_404(Product, id_produk=product_id)
+            product_obj = _get_product_or_404(product_id)
             product_obj.delete()
             return JsonResponse({
                 'success': True,
@@ -142,4 +175,44 @@ def delete_product_api(request, product_id):
     
     return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
 
+async def product_events_api(request):
+    """API endpoint streaming product changes as Server-Sent Events (GET)"""
+    if request.method != 'GET':
+        return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+    events.start_listener()
+
+    current = await sync_to_async(CatalogVersion.current)()
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id', ''))
+    except ValueError:
+        last_id = current
+
+    # Under WSGI every open stream holds a whole worker: answer right away and
+    # let the browser poll instead of long-polling
+    asgi = isinstance(request, ASGIRequest)
+    if current != last_id:
+        # Client is behind the database: the events should already be in the
+        # buffer (or arrive shortly), otherwise it has to reset
+        timeout = events.CATCH_UP_TIMEOUT
+    else:
+        timeout = events.POLL_TIMEOUT if asgi else 0
+
+    async def stream():
+        # Long-poll over SSE: send one batch of events (or a heartbeat on
+        # timeout) and close; EventSource reconnects with Last-Event-ID.
+        yield f'retry: {1000 if asgi else 5000}\n\n'
+        pending = await events.feed.wait(last_id, timeout)
+        if not pending and current != last_id:
+            # Changes this process never received (made before its LISTEN
+            # thread started, or by another process on SQLite)
+            pending = [(current, 'reset', {})]
+        if not pending:
+            yield ': heartbeat\n\n'
+        for event_id, event_type, data in pending:
+            yield f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n'
 
+    return StreamingHttpResponse(stream(), content_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })